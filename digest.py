@@ -1,27 +1,143 @@
+import functools
+import gzip
+import hashlib
+import io
 import json
 import logging
 import os
+import re
 import smtplib
-from dataclasses import dataclass
+import ssl
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
 from datetime import datetime, timedelta, timezone
 from email.mime.text import MIMEText
 from email.utils import formatdate
 from pathlib import Path
-from typing import Any, List
+from typing import TYPE_CHECKING, Any, Callable, Iterator, List
 
 import requests
-from google import genai
-import markdown
-from premailer import transform
-from notion_client import Client as NotionClient
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# google-genai and markdown are imported where they are used so that
+# start-up (and runs that exit before generation) do not pay for loading them
+if TYPE_CHECKING:
+    import markdown
+    from google import genai
 
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+logger = logging.getLogger(__name__)
 
 GDELT_ENDPOINT = "https://api.gdeltproject.org/api/v2/doc/doc"
+# Bytes of a streamed GDELT body inspected (and logged on errors) before JSON parsing
+GDELT_PEEK_BYTES = 500
+NOTION_API_URL = "https://api.notion.com/v1"
+NOTION_API_VERSION = "2022-06-28"
+# Notion accepts at most 100 child blocks per create/append request
+NOTION_MAX_BLOCKS = 100
 CONFIG_DIR = Path(os.getenv("CONFIG_DIR", "config"))
 REPORT_DIR = Path(os.getenv("REPORT_DIR", "artifacts"))
+CACHE_DIR = Path(os.getenv("CACHE_DIR", str(REPORT_DIR / ".cache")))
+# Inline the email CSS with premailer (set false to send the <style> block as-is and skip premailer).
+EMAIL_INLINE_CSS = os.getenv("EMAIL_INLINE_CSS", "true").strip().lower() not in ("0", "false", "no", "off")
+# Delivery reports older than this are deleted from REPORT_DIR (0 keeps them forever).
+REPORT_RETENTION_DAYS = int(os.getenv("REPORT_RETENTION_DAYS", "30"))
 DEFAULT_MODEL = os.getenv("GEMINI_MODEL", "").strip() or "gemini-2.5-flash"
+# Gemini explicit context caching for the static prompt prefix (0 disables). Only pays off
+# when runs share CACHE_DIR within the TTL; the scheduled workflow turns it off.
+PROMPT_CACHE_TTL_SECONDS = int(os.getenv("PROMPT_CACHE_TTL_SECONDS", "3600"))
+# Gemini rejects cached contents below its minimum token count; skip obviously small prefixes.
+PROMPT_CACHE_MIN_CHARS = 4096
+# Reuse GDELT results and generated digests for identical reruns within this window (0 disables).
+RESPONSE_CACHE_TTL_SECONDS = int(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "900"))
+RESPONSE_CACHE_MAX_AGE_SECONDS = 3600
+# Duplicate article detection: exact (source, title prefix) key while fetching, then a
+# rapidfuzz token_sort_ratio threshold. Titles shorter than NEWS_DEDUP_MIN_TOKENS words
+# ("Oil prices", "Live updates") are too generic to fuzzy-match safely.
+NEWS_DEDUP_TITLE_PREFIX = 60
+NEWS_DEDUP_SIMILARITY = 85
+NEWS_DEDUP_MIN_TOKENS = 4
+
+# Upper bound on concurrent Slack webhook posts (matches the session pool comfortably)
+SLACK_MAX_WORKERS = 4
+
+# Shared session so GDELT/Slack/Notion requests reuse pooled TCP+TLS connections.
+# POST/PATCH are not retried on error statuses (urllib3 default) to avoid duplicate messages/pages.
+_HTTP = requests.Session()
+_HTTP.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=16,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=[429, 500, 502, 503, 504],
+            raise_on_status=False,
+        ),
+    ),
+)
+
+# Regex patterns used when converting/parsing digest markdown (compiled once at import)
+_LINK_RE = re.compile(r'<a\s+href="([^"]*)">([^<]*)</a>')
+_HTML_TAG_RE = re.compile(r'<(?!a\s)(?!/a>)[^>]+>')
+_TABLE_SEPARATOR_RE = re.compile(r'^\|[\s\-|:]+\|$')
+_NUMBERED_LIST_RE = re.compile(r'^\d+[.)] ')
+_HEADING_TYPES = {"#": "heading_1", "##": "heading_2", "###": "heading_3"}
+_NUMBER_RE = re.compile(r'(\d+\.?\d*)')
+# Bounded repeats: an unbounded name run is retried from every start position (quadratic on long words)
+_PRIORITY_STOCK_RE = re.compile(r'[\w가-힣]{1,40}\s{0,3}\([A-Z0-9]{1,12}\)')
+# Label lines in the digest body; each captures the rest of the line after the label
+_SUMMARY_LINE_RE = re.compile(r'💡 한줄 요약:([^\n]*)')
+_ATMOSPHERE_LINE_RE = re.compile(r'\*\*시장 분위기\*\*: ([^ \n]*)')
+_PRIORITY_LINE_RE = re.compile(r'\*\*🎯 최우선 관심\*\*:([^\n]*)')
+# Plain substring tests on purpose: Korean keywords carry attached particles (금리가, 중국의),
+# so word-boundary matchers would miss them, and "금" must also match inside "금리"
+THEME_KEYWORDS = ("반도체", "금리", "AI", "지정학", "실적", "금", "원자재", "로테이션", "정치", "중국")
+THEME_KEYWORD_SCAN_CHARS = 2000
+_REGIME_SECTION = "## 0. 시장 레짐"
+# Notion select option for each count of filled stars (index 0 unused)
+_CONFIDENCE_TABLE = (
+    "",
+    "★☆☆☆☆ (<30%)",
+    "★★☆☆☆ (30-49%)",
+    "★★★☆☆ (50-69%)",
+    "★★★★☆ (70-89%)",
+    "★★★★★ (90%+)",
+)
+# Second cell of the regime table row whose first cell starts with the key
+_REGIME_ROW_RES = {
+    key: re.compile(rf'^[ \t]*\| {re.escape(key)}[^|\n]*\|([^|\n]*)', re.MULTILINE)
+    for key in ("시장 모드", "글로벌 심리", "변동성 환경", "분석 확신도")
+}
+# All market index mentions in one alternation; lastgroup names the field that matched
+_MARKET_VALUE_RE = re.compile(
+    r'(?:S&P\s{0,3}500|S&P)[:\s]{1,10}(?P<sp500>\d{4,5}\.?\d*)'
+    r'|KOSPI[:\s]{1,10}(?P<kospi>\d{4,5}\.?\d*)'
+    r'|(?:USD/KRW|원달러)[:\s]{1,10}(?P<usdkrw>\d{4}\.?\d*)'
+    r'|(?:10Y|10년물)[:\s]{1,10}(?P<bond_10y>\d+\.?\d*)%',
+    re.IGNORECASE,
+)
+# Sanity checks - only accept realistic values for each field
+_MARKET_VALUE_CHECKS: dict[str, Callable[[float], bool]] = {
+    "sp500": lambda value: value > 1000,
+    "kospi": lambda value: value > 1000,
+    "usdkrw": lambda value: 1000 <= value <= 2000,  # won/dollar
+    "bond_10y": lambda value: 0.5 <= value <= 10,  # percent
+}
+# VIX fallback when the regime table has no value. Kept out of the alternation above and
+# only a tight separator is allowed, so it cannot swallow another field's label (or the
+# "10" of "10Y") and steal its match.
+_VIX_VALUE_RE = re.compile(r'VIX\s{0,3}[:=(]?\s{0,3}(\d+\.?\d*)(?![\d.]*[%Y년])')
 
 DEFAULT_KEYWORDS = [
     "금리",
@@ -85,8 +201,18 @@ DEFAULT_PROMPT_RICE = """### R (Role) - 역할
 오늘의 핵심 뉴스 & 수혜주
 """
 
+SYSTEM_INSTRUCTION = "당신은 신중한 금융 리서치 보조자입니다. 주어진 뉴스 근거를 벗어나 추측하지 말고, 불확실한 값은 명확히 표시하세요."
+# Fixed instructions between the prompt file and the news list. Keeping them (and the
+# system instruction) byte-identical across runs is what lets the Gemini prompt cache hit.
+USER_PROMPT_PREAMBLE = (
+    "아래는 최근 24시간 뉴스 후보 목록입니다. 반드시 이 목록을 우선 근거로 분석하세요.\n"
+    "출력은 Example 형식을 최대한 그대로 유지해 주세요.\n"
+    "현재가/등락 등 실시간 시세가 확실하지 않으면 '확인 필요'로 표기하세요.\n\n"
+)
+NEWS_LIST_HEADER = "[최근 24시간 뉴스 목록]\n"
+
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class NewsItem:
     title: str
     url: str
@@ -94,7 +220,7 @@ class NewsItem:
     published_at: str
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class DeliveryStatus:
     enabled: bool
     attempted: bool
@@ -102,15 +228,18 @@ class DeliveryStatus:
     detail: str
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class RuntimeConfig:
     profile: str
     time_window_hours: int
     max_gdelt_records: int
     max_news_in_context: int
     slack_chunk_size: int
+    slack_stream: bool
+    slack_parallel: bool
     keywords: List[str]
     theme_query: str
+    query: str
     prompt_rice: str
     prompt_path: str
 
@@ -120,27 +249,57 @@ def iso_utc_now() -> datetime:
 
 
 def to_gdelt_dt(dt: datetime) -> str:
-    return dt.strftime("%Y%m%d%H%M%S")
+    # Same output as strftime("%Y%m%d%H%M%S") without the locale-aware formatter
+    return f"{dt.year:04d}{dt.month:02d}{dt.day:02d}{dt.hour:02d}{dt.minute:02d}{dt.second:02d}"
+
+
+def loads_json(data: bytes | str) -> Any:
+    # orjson is optional; it parses the same documents 2-3x faster than stdlib json
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps_json(obj: Any) -> bytes:
+    """Serialize obj as indented UTF-8 JSON, via orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+@functools.lru_cache(maxsize=32)
+def read_json_cached(path_str: str, mtime_ns: int, size: int) -> Any:
+    # Same mtime/size keying as read_text_cached; the parsed value is shared, so callers only read it
+    return loads_json(Path(path_str).read_bytes())
 
 
 def load_json(path: Path) -> dict[str, Any]:
-    if not path.exists():
-        logging.warning("Config file not found: %s", path)
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        logger.warning("Config file not found: %s", path)
         return {}
+    data = read_json_cached(str(path), st.st_mtime_ns, st.st_size)
+
+    if isinstance(data, dict):
+        return data
+    logger.warning("Invalid config format (dict expected): %s", path)
+    return {}
 
-    with path.open("r", encoding="utf-8") as fp:
-        data = json.load(fp)
-        if isinstance(data, dict):
-            return data
-        logging.warning("Invalid config format (dict expected): %s", path)
-        return {}
+
+@functools.lru_cache(maxsize=8)
+def read_text_cached(path_str: str, mtime_ns: int, size: int) -> str:
+    # mtime/size are part of the cache key so edits to the file invalidate the entry
+    return Path(path_str).read_text(encoding="utf-8").strip()
 
 
 def load_text(path: Path, fallback: str) -> str:
-    if not path.exists():
-        logging.warning("Prompt file not found: %s", path)
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        logger.warning("Prompt file not found: %s", path)
         return fallback
-    return path.read_text(encoding="utf-8").strip() or fallback
+    return read_text_cached(str(path), st.st_mtime_ns, st.st_size) or fallback
 
 
 def resolve_prompt_path(profile_cfg: dict[str, Any]) -> Path:
@@ -148,6 +307,10 @@ def resolve_prompt_path(profile_cfg: dict[str, Any]) -> Path:
     return CONFIG_DIR / str(prompt_rel)
 
 
+def parse_bool(value: Any) -> bool:
+    return str(value).strip().lower() in ("1", "true", "yes", "on")
+
+
 def load_runtime_config() -> RuntimeConfig:
     profile_name = os.getenv("DIGEST_PROFILE", "default").strip() or "default"
     settings = load_json(CONFIG_DIR / "settings.json")
@@ -174,8 +337,16 @@ def load_runtime_config() -> RuntimeConfig:
         os.getenv("SLACK_CHUNK_SIZE", profile_settings.get("slack_chunk_size", settings.get("slack_chunk_size", 3500)))
     )
 
+    slack_stream = parse_bool(
+        os.getenv("SLACK_STREAM", profile_settings.get("slack_stream", settings.get("slack_stream", True)))
+    )
+    slack_parallel = parse_bool(
+        os.getenv("SLACK_PARALLEL", profile_settings.get("slack_parallel", settings.get("slack_parallel", True)))
+    )
+
     raw_keywords = profile_cfg.get("keywords", keyword_cfg.get("keywords", DEFAULT_KEYWORDS))
-    keywords = [str(x).strip() for x in raw_keywords if str(x).strip()]
+    # Strip each entry once and drop blanks/duplicates (first occurrence wins) so the GDELT query stays short
+    keywords = list(dict.fromkeys(kw for kw in (str(x).strip() for x in raw_keywords) if kw))
     if not keywords:
         keywords = DEFAULT_KEYWORDS
 
@@ -189,7 +360,15 @@ def load_runtime_config() -> RuntimeConfig:
         )
     ).strip()
 
-    logging.info("Loaded profile=%s prompt=%s keyword_count=%d", profile_name, prompt_path, len(keywords))
+    # Filter out non-ASCII keywords and very short keywords (GDELT API rejects them)
+    english_keywords = tuple(kw for kw in keywords if kw.isascii() and len(kw) >= 3)
+    if not english_keywords:
+        logger.warning("No valid ASCII keywords found, using fallback")
+        english_keywords = ("inflation", "economy", "market")
+    keyword_query = " OR ".join(f'"{kw}"' for kw in english_keywords)
+    query = f"({keyword_query}) AND {theme_query}"
+
+    logger.info("Loaded profile=%s prompt=%s keyword_count=%d", profile_name, prompt_path, len(keywords))
 
     return RuntimeConfig(
         profile=profile_name,
@@ -197,22 +376,139 @@ def load_runtime_config() -> RuntimeConfig:
         max_gdelt_records=max_gdelt_records,
         max_news_in_context=max_news_in_context,
         slack_chunk_size=slack_chunk_size,
+        slack_stream=slack_stream,
+        slack_parallel=slack_parallel,
         keywords=keywords,
         theme_query=theme_query,
+        query=query,
         prompt_rice=prompt_rice,
         prompt_path=str(prompt_path),
     )
 
 
 def build_query(cfg: RuntimeConfig) -> str:
-    # Filter out non-ASCII keywords and very short keywords (GDELT API rejects them)
-    english_keywords = [kw for kw in cfg.keywords if kw.isascii() and len(kw) >= 3]
-    if not english_keywords:
-        logging.warning("No valid ASCII keywords found, using fallback")
-        english_keywords = ["inflation", "economy", "market"]
+    # Precomputed once in load_runtime_config
+    return cfg.query
 
-    keyword_query = " OR ".join(f'"{kw}"' for kw in english_keywords)
-    return f"({keyword_query}) AND {cfg.theme_query}"
+
+def response_cache_key(*parts: Any) -> str:
+    return hashlib.sha256("|".join(str(p) for p in parts).encode("utf-8")).hexdigest()
+
+
+def read_response_cache(key: str, suffix: str) -> str | None:
+    """Return cached text for key if it is younger than RESPONSE_CACHE_TTL_SECONDS."""
+    if RESPONSE_CACHE_TTL_SECONDS <= 0:
+        return None
+    path = CACHE_DIR / f"response-{key}.{suffix}"
+    try:
+        if time.time() - path.stat().st_mtime >= RESPONSE_CACHE_TTL_SECONDS:
+            return None
+        return path.read_text(encoding="utf-8")
+    except FileNotFoundError:
+        return None
+
+
+def write_response_cache(key: str, suffix: str, text: str) -> None:
+    if RESPONSE_CACHE_TTL_SECONDS <= 0:
+        return
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    (CACHE_DIR / f"response-{key}.{suffix}").write_text(text, encoding="utf-8")
+
+
+def prune_response_cache() -> None:
+    """Delete cached responses older than RESPONSE_CACHE_MAX_AGE_SECONDS."""
+    if not CACHE_DIR.exists():
+        return
+    cutoff = time.time() - RESPONSE_CACHE_MAX_AGE_SECONDS
+    for path in CACHE_DIR.glob("response-*"):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+        except FileNotFoundError:
+            continue
+
+
+def iter_gdelt_articles(resp: requests.Response) -> Iterator[dict[str, Any]]:
+    """
+    Yield article rows from a streamed GDELT response.
+
+    With ijson installed the "articles" array is parsed incrementally, so the caller can stop
+    after max_news_in_context rows without materializing the whole payload.
+    Falls back to parsing the full body when ijson is unavailable.
+    """
+    try:
+        import ijson
+    except ImportError:
+        ijson = None
+
+    if ijson is not None:
+        resp.raw.decode_content = True
+        # Buffer the raw stream so the first bytes can be inspected without consuming them
+        stream = io.BufferedReader(resp.raw)
+        head = stream.peek(GDELT_PEEK_BYTES)
+        if not head.strip():
+            logger.warning("GDELT returned empty response")
+            return
+        if head.lstrip()[:1] != b"{":
+            # GDELT reports query errors as plain text, not JSON
+            logger.error("Failed to parse GDELT JSON response: body is not a JSON object")
+            logger.error("Response text: %s", head[:GDELT_PEEK_BYTES].decode("utf-8", errors="replace"))
+            return
+        try:
+            yield from ijson.items(stream, "articles.item")
+        except ijson.JSONError as exc:
+            logger.error("Failed to parse GDELT JSON response: %s", exc)
+        return
+
+    body = resp.content
+    if not body.strip():
+        logger.warning("GDELT returned empty response")
+        return
+
+    try:
+        # orjson.JSONDecodeError subclasses ValueError, so one handler covers both parsers
+        payload = loads_json(body)
+    except ValueError as exc:
+        logger.error("Failed to parse GDELT JSON response: %s", exc)
+        logger.error("Response text: %s", resp.text[:GDELT_PEEK_BYTES])
+        return
+
+    yield from payload.get("articles", [])
+
+
+def dedupe_news_items(news_items: List[NewsItem]) -> List[NewsItem]:
+    """
+    Drop near-duplicate articles so repeated stories do not waste prompt tokens.
+
+    Exact duplicates (same URL, or same source and title prefix) are already skipped while
+    fetching. This fuzzy pass needs rapidfuzz: titles of at least NEWS_DEDUP_MIN_TOKENS words
+    that closely match an already kept title of that length (same story from another wire
+    service) are dropped. Without rapidfuzz the list is returned unchanged.
+    """
+    try:
+        from rapidfuzz import fuzz, utils
+    except ImportError:
+        return news_items
+
+    deduped: List[NewsItem] = []
+    fuzzy_candidates: List[NewsItem] = []
+    for item in news_items:
+        # token_sort_ratio rather than token_set_ratio: the latter scores 100 whenever one
+        # title's words are a subset of the other's, so a generic title would swallow others.
+        # rapidfuzz 3.x applies no processor by default; normalize case and punctuation here.
+        fuzzy = len(item.title.split()) >= NEWS_DEDUP_MIN_TOKENS
+        if fuzzy and any(
+            fuzz.token_sort_ratio(item.title, kept.title, processor=utils.default_process) > NEWS_DEDUP_SIMILARITY
+            for kept in fuzzy_candidates
+        ):
+            continue
+        deduped.append(item)
+        if fuzzy:
+            fuzzy_candidates.append(item)
+
+    if len(deduped) < len(news_items):
+        logger.info("Removed %d near-duplicate articles", len(news_items) - len(deduped))
+    return deduped
 
 
 def fetch_recent_news(cfg: RuntimeConfig) -> List[NewsItem]:
@@ -220,6 +516,15 @@ def fetch_recent_news(cfg: RuntimeConfig) -> List[NewsItem]:
     start_dt = end_dt - timedelta(hours=cfg.time_window_hours)
 
     query = build_query(cfg)
+    # Round the window start down to 10 minutes so reruns share a cache key
+    rounded_start = start_dt.replace(minute=start_dt.minute - start_dt.minute % 10, second=0, microsecond=0)
+    cache_key = response_cache_key(query, to_gdelt_dt(rounded_start), cfg.max_gdelt_records, cfg.max_news_in_context)
+    cached = read_response_cache(cache_key, "news.json")
+    if cached is not None:
+        news_items = [NewsItem(**row) for row in loads_json(cached)]
+        logger.info("Using %d cached GDELT articles (key=%s)", len(news_items), cache_key[:12])
+        return news_items
+
     params = {
         "query": query,
         "mode": "artlist",
@@ -230,111 +535,289 @@ def fetch_recent_news(cfg: RuntimeConfig) -> List[NewsItem]:
         "enddatetime": to_gdelt_dt(end_dt),
     }
 
-    logging.info("Fetching GDELT articles between %s and %s UTC", start_dt.isoformat(), end_dt.isoformat())
-    logging.info("GDELT query: %s", query)
-    resp = requests.get(GDELT_ENDPOINT, params=params, timeout=30)
-    resp.raise_for_status()
-
-    if not resp.text.strip():
-        logging.warning("GDELT returned empty response")
-        return []
-
-    try:
-        payload = resp.json()
-    except ValueError as exc:
-        logging.error("Failed to parse GDELT JSON response: %s", exc)
-        logging.error("Response text: %s", resp.text[:500])
-        return []
-
-    articles = payload.get("articles", [])
+    logger.info("Fetching GDELT articles between %s and %s UTC", start_dt.isoformat(), end_dt.isoformat())
+    logger.info("GDELT query: %s", query)
     news_items: List[NewsItem] = []
+    seen_urls: set[str] = set()
+    seen_titles: set[tuple[str, str]] = set()
+    with _HTTP.get(GDELT_ENDPOINT, params=params, timeout=30, stream=True) as resp:
+        resp.raise_for_status()
 
-    for row in articles[: cfg.max_news_in_context]:
-        title = (row.get("title") or "").strip()
-        url = (row.get("url") or "").strip()
-        if not title or not url:
-            continue
+        for row in iter_gdelt_articles(resp):
+            get = row.get
+            title = (get("title") or "").strip()
+            url = (get("url") or "").strip()
+            if not title or not url:
+                continue
+            # Mirror domains and tracking params often repeat the same article URL
+            norm_url = url.split("?", 1)[0].rstrip("/").lower()
+            if norm_url in seen_urls:
+                continue
+            seen_urls.add(norm_url)
+
+            # GDELT returns domain/seendate already trimmed; only free-text fields need strip()
+            source = get("domain") or get("sourcecountry") or "unknown"
+            # Same story re-listed by one source under another URL; checked before the cap below
+            title_key = (source, title[:NEWS_DEDUP_TITLE_PREFIX].lower())
+            if title_key in seen_titles:
+                continue
+            seen_titles.add(title_key)
+            published_at = get("seendate") or get("socialimage") or "unknown"
+            news_items.append(NewsItem(title=title, url=url, source=source, published_at=published_at))
+            # Cap on usable articles, so rows without title/url do not eat into the budget
+            if len(news_items) >= cfg.max_news_in_context:
+                break
 
-        source = (row.get("domain") or row.get("sourcecountry") or "unknown").strip()
-        published_at = (row.get("seendate") or row.get("socialimage") or "unknown").strip()
-        news_items.append(
-            NewsItem(
-                title=title,
-                url=url,
-                source=source,
-                published_at=published_at,
-            )
+    news_items = dedupe_news_items(news_items)
+    logger.info("Fetched %d candidate articles", len(news_items))
+    if news_items:
+        write_response_cache(
+            cache_key, "news.json", json.dumps([asdict(item) for item in news_items], ensure_ascii=False)
         )
-
-    logging.info("Fetched %d candidate articles", len(news_items))
     return news_items
 
 
 def build_news_context(news_items: List[NewsItem]) -> str:
-    lines = []
-    for i, item in enumerate(news_items, 1):
-        lines.append(
-            f"[{i}] 제목: {item.title}\\n"
-            f"- 출처: {item.source}\\n"
-            f"- 시간: {item.published_at}\\n"
-            f"- 링크: {item.url}"
-        )
-    return "\\n\\n".join(lines)
+    # List comprehension rather than a generator: str.join materializes its input anyway
+    return "\n\n".join([
+        f"[{i}] 제목: {item.title}\n- 출처: {item.source}\n- 시간: {item.published_at}\n- 링크: {item.url}"
+        for i, item in enumerate(news_items, 1)
+    ])
 
 
-def generate_digest(news_items: List[NewsItem], prompt_rice: str) -> str:
-    if not os.getenv("GOOGLE_API_KEY"):
-        raise RuntimeError("GOOGLE_API_KEY is required")
+_GENAI_CLIENT: "genai.Client | None" = None
+_GENAI_CLIENT_LOCK = threading.Lock()
 
-    client = genai.Client(api_key=os.environ["GOOGLE_API_KEY"])
-    context = build_news_context(news_items)
 
-    system_instruction = "당신은 신중한 금융 리서치 보조자입니다. 주어진 뉴스 근거를 벗어나 추측하지 말고, 불확실한 값은 명확히 표시하세요."
+def get_genai_client() -> "genai.Client":
+    """Return the process-wide Gemini client, creating it on first use."""
+    global _GENAI_CLIENT
+    # Locked because main() may already be building the client on a warm-up thread
+    with _GENAI_CLIENT_LOCK:
+        if _GENAI_CLIENT is None:
+            from google import genai
+
+            _GENAI_CLIENT = genai.Client(api_key=os.environ["GOOGLE_API_KEY"])
+        return _GENAI_CLIENT
 
-    user_input = (
-        f"{prompt_rice}\\n\\n"
-        "아래는 최근 24시간 뉴스 후보 목록입니다. 반드시 이 목록을 우선 근거로 분석하세요.\\n"
-        "출력은 Example 형식을 최대한 그대로 유지해 주세요.\\n"
-        "현재가/등락 등 실시간 시세가 확실하지 않으면 '확인 필요'로 표기하세요.\\n\\n"
-        f"[최근 24시간 뉴스 목록]\\n{context}"
+
+def prompt_cache_meta_path(system_instruction: str, prompt_prefix: str) -> Path:
+    cache_key = hashlib.sha256(
+        f"{DEFAULT_MODEL}\n{system_instruction}\n{prompt_prefix}".encode("utf-8")
+    ).hexdigest()
+    return CACHE_DIR / f"prompt-cache-{cache_key[:16]}.json"
+
+
+def invalidate_prompt_cache(system_instruction: str, prompt_prefix: str) -> None:
+    """Forget a cache name the server rejected so the next run creates a fresh one."""
+    prompt_cache_meta_path(system_instruction, prompt_prefix).unlink(missing_ok=True)
+
+
+def is_prompt_cache_rejection(exc: Exception) -> bool:
+    """True when a Gemini client error means the cached content is gone or not ours."""
+    if getattr(exc, "code", None) in (403, 404):
+        return True
+    message = str(exc).lower()
+    return "cached_content" in message or "cachedcontent" in message
+
+
+def get_prompt_cache(client: "genai.Client", system_instruction: str, prompt_prefix: str) -> str | None:
+    """
+    Return the name of a Gemini cached content holding the static prompt prefix.
+
+    The cache name is persisted under CACHE_DIR keyed by a hash of the model and prefix,
+    so runs within the TTL reuse it. Returns None when caching is disabled or unavailable.
+    """
+    if PROMPT_CACHE_TTL_SECONDS <= 0:
+        return None
+    if len(system_instruction) + len(prompt_prefix) < PROMPT_CACHE_MIN_CHARS:
+        logger.info("Prompt prefix too small for context caching, sending full prompt")
+        return None
+
+    meta_path = prompt_cache_meta_path(system_instruction, prompt_prefix)
+
+    now = time.time()
+    if meta_path.exists():
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            # Leave a margin so the cache does not expire mid-request
+            if meta.get("expires_at", 0) - now > 60:
+                logger.info("Reusing Gemini prompt cache: %s", meta["name"])
+                return str(meta["name"])
+        except (ValueError, KeyError) as exc:
+            logger.warning("Ignoring invalid prompt cache metadata %s: %s", meta_path, exc)
+
+    from google.genai import types as genai_types
+
+    try:
+        cache = client.caches.create(
+            model=DEFAULT_MODEL,
+            config=genai_types.CreateCachedContentConfig(
+                system_instruction=system_instruction,
+                contents=[prompt_prefix],
+                ttl=f"{PROMPT_CACHE_TTL_SECONDS}s",
+            ),
+        )
+    except Exception as exc:
+        logger.warning("Gemini context caching unavailable, sending full prompt: %s", exc)
+        return None
+
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    meta_path.write_text(
+        json.dumps({"name": cache.name, "model": DEFAULT_MODEL, "expires_at": now + PROMPT_CACHE_TTL_SECONDS}),
+        encoding="utf-8",
     )
+    logger.info("Created Gemini prompt cache: %s (ttl=%ds)", cache.name, PROMPT_CACHE_TTL_SECONDS)
+    return cache.name
+
+
+def generate_digest(
+    news_items: List[NewsItem],
+    prompt_rice: str,
+    on_text: Callable[[str], None] | None = None,
+) -> str:
+    """
+    Generate the digest with Gemini.
 
-    full_prompt = f"{system_instruction}\\n\\n{user_input}"
+    When on_text is given the response is streamed and each text fragment is passed to it
+    as soon as it arrives (e.g. to start Slack delivery before generation finishes).
+    """
+    if not os.getenv("GOOGLE_API_KEY"):
+        raise RuntimeError("GOOGLE_API_KEY is required")
+
+    context = build_news_context(news_items)
+    # Static part of the prompt (identical across runs) vs. the per-run news list
+    prompt_prefix = f"{prompt_rice}\n\n{USER_PROMPT_PREAMBLE}"
+    news_input = f"{NEWS_LIST_HEADER}{context}"
+
+    # Key on the full prompt so edits to the system instruction or preamble invalidate cached digests
+    cache_key = response_cache_key(DEFAULT_MODEL, SYSTEM_INSTRUCTION, prompt_prefix, news_input)
+    cached = read_response_cache(cache_key, "digest.md")
+    if cached:
+        logger.info("Using cached digest for identical prompt (key=%s)", cache_key[:12])
+        if on_text is not None:
+            on_text(cached)
+        return cached
+
+    from google.genai import errors as genai_errors
+    from google.genai import types as genai_types
+
+    client = get_genai_client()
+
+    emitted = False
+    usage = None
+
+    def run(contents: str, config: "genai_types.GenerateContentConfig | None") -> str:
+        nonlocal emitted, usage
+        if on_text is None:
+            response = client.models.generate_content(model=DEFAULT_MODEL, contents=contents, config=config)
+            usage = response.usage_metadata
+            return response.text or ""
+        parts: List[str] = []
+        for chunk in client.models.generate_content_stream(model=DEFAULT_MODEL, contents=contents, config=config):
+            # Usage metadata is reported on the final chunk(s) of a stream
+            usage = chunk.usage_metadata or usage
+            if chunk.text:
+                parts.append(chunk.text)
+                emitted = True
+                on_text(chunk.text)
+        return "".join(parts)
+
+    logger.info("Generating digest with model=%s stream=%s", DEFAULT_MODEL, on_text is not None)
+    output = None
+    cache_name = get_prompt_cache(client, SYSTEM_INSTRUCTION, prompt_prefix)
+    if cache_name:
+        try:
+            output = run(news_input, genai_types.GenerateContentConfig(cached_content=cache_name))
+        except genai_errors.ClientError as exc:
+            # Cache may have been evicted server-side before its recorded expiry. Other 4xx
+            # errors (429 rate limits, bad requests) say nothing about the cache, so keep its
+            # metadata and do not retry with the larger full prompt.
+            if emitted or not is_prompt_cache_rejection(exc):
+                raise
+            logger.warning("Cached prompt rejected, retrying with full prompt: %s", exc)
+            invalidate_prompt_cache(SYSTEM_INSTRUCTION, prompt_prefix)
+
+    if output is None:
+        full_prompt = f"{SYSTEM_INSTRUCTION}\n\n{prompt_prefix}{news_input}"
+        output = run(full_prompt, None)
+
+    if usage is not None:
+        # cached_content_token_count > 0 confirms the prompt cache was hit
+        logger.info(
+            "Gemini usage: prompt_tokens=%s cached_tokens=%s output_tokens=%s",
+            usage.prompt_token_count,
+            usage.cached_content_token_count,
+            usage.candidates_token_count,
+        )
 
-    logging.info("Generating digest with model=%s", DEFAULT_MODEL)
-    response = client.models.generate_content(model=DEFAULT_MODEL, contents=full_prompt)
-    output = response.text.strip()
+    output = output.strip()
     if not output:
         raise RuntimeError("Gemini returned empty output")
+    write_response_cache(cache_key, "digest.md", output)
     return output
 
 
 def split_for_slack(text: str, chunk_size: int) -> List[str]:
+    # Advance cursors through text and slice each chunk once instead of copying the remainder
     chunks: List[str] = []
-    remaining = text
-    while len(remaining) > chunk_size:
-        cut = remaining.rfind("\n", 0, chunk_size)
-        if cut <= 0:
-            cut = chunk_size
-        chunks.append(remaining[:cut].strip())
-        remaining = remaining[cut:].strip()
-    if remaining:
-        chunks.append(remaining)
+    start, end = 0, len(text)
+    while end - start > chunk_size:
+        cut = text.rfind("\n", start, start + chunk_size)
+        if cut <= start:
+            cut = start + chunk_size
+        chunk = text[start:cut].strip()
+        if chunk:
+            chunks.append(chunk)
+        # Equivalent to strip() on the remainder
+        start = cut
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+    if end > start:
+        chunks.append(text[start:end])
     return chunks
 
 
-def send_to_slack(text: str, chunk_size: int) -> DeliveryStatus:
+def post_slack_chunk(webhook: str, chunk: str) -> None:
+    resp = _HTTP.post(webhook, json={"text": chunk}, timeout=20)
+    resp.raise_for_status()
+
+
+def send_to_slack(text: str, chunk_size: int, parallel: bool = False) -> DeliveryStatus:
     webhook = os.getenv("SLACK_WEBHOOK_URL")
     if not webhook:
-        logging.info("SLACK_WEBHOOK_URL not set, skipping Slack delivery")
+        logger.info("SLACK_WEBHOOK_URL not set, skipping Slack delivery")
         return DeliveryStatus(enabled=False, attempted=False, success=False, detail="webhook_not_configured")
 
+    chunks = split_for_slack(text, chunk_size)
+    if parallel and len(chunks) > 1:
+        # Concurrent posts may land out of order, so number each chunk for the reader.
+        # Reserve the "(i/N) " width before splitting so numbered chunks stay within chunk_size;
+        # re-split if the narrower chunks push N to more digits.
+        total = len(chunks)
+        while True:
+            chunks = split_for_slack(text, chunk_size - len(f"({total}/{total}) "))
+            if len(chunks) <= total:
+                break
+            total = len(chunks)
+        total = len(chunks)
+        numbered = [f"({idx}/{total}) {chunk}" for idx, chunk in enumerate(chunks, 1)]
+        with ThreadPoolExecutor(max_workers=min(SLACK_MAX_WORKERS, total)) as pool:
+            list(pool.map(lambda chunk: post_slack_chunk(webhook, chunk), numbered))
+        logger.info("Sent %d Slack chunks in parallel", total)
+        return DeliveryStatus(
+            enabled=True,
+            attempted=True,
+            success=True,
+            detail=f"sent_chunks={total}, parallel",
+        )
+
     sent_chunks = 0
-    for idx, chunk in enumerate(split_for_slack(text, chunk_size), 1):
-        payload = {"text": chunk}
-        resp = requests.post(webhook, json=payload, timeout=20)
-        resp.raise_for_status()
-        logging.info("Sent Slack chunk %d", idx)
+    for idx, chunk in enumerate(chunks, 1):
+        post_slack_chunk(webhook, chunk)
+        logger.info("Sent Slack chunk %d", idx)
         sent_chunks += 1
 
     return DeliveryStatus(
@@ -345,6 +828,282 @@ def send_to_slack(text: str, chunk_size: int) -> DeliveryStatus:
     )
 
 
+class SlackStreamer:
+    """
+    Post a digest to Slack while Gemini is still generating it.
+
+    Streamed text is buffered and flushed at the last line break within chunk_size.
+    Posts run on a single background worker, so they keep their order and overlap
+    with model decoding. After the first failed post, remaining chunks are dropped.
+    """
+
+    def __init__(self, webhook: str, chunk_size: int) -> None:
+        self.webhook = webhook
+        self.chunk_size = chunk_size
+        self._buf = ""
+        self._sent_chunks = 0
+        self._error: Exception | None = None
+        self._pool = ThreadPoolExecutor(max_workers=1)
+
+    def feed(self, text: str) -> None:
+        self._buf += text
+        while len(self._buf) > self.chunk_size:
+            cut = self._buf.rfind("\n", 0, self.chunk_size)
+            if cut <= 0:
+                cut = self.chunk_size
+            self._submit(self._buf[:cut])
+            self._buf = self._buf[cut:]
+
+    def close(self, flush: bool = True) -> DeliveryStatus:
+        """Wait for pending posts. With flush=False the unsent remainder is discarded."""
+        if flush:
+            self._submit(self._buf)
+        self._buf = ""
+        self._pool.shutdown(wait=True)
+
+        if self._error is not None:
+            raise self._error
+        if not flush:
+            return DeliveryStatus(
+                enabled=True,
+                attempted=self._sent_chunks > 0,
+                success=False,
+                detail=f"aborted_after_chunks={self._sent_chunks}",
+            )
+        return DeliveryStatus(
+            enabled=True,
+            attempted=True,
+            success=True,
+            detail=f"sent_chunks={self._sent_chunks}, streamed",
+        )
+
+    def _submit(self, chunk: str) -> None:
+        chunk = chunk.strip()
+        if chunk:
+            self._pool.submit(self._post, chunk)
+
+    def _post(self, chunk: str) -> None:
+        if self._error is not None:
+            return
+        try:
+            post_slack_chunk(self.webhook, chunk)
+        except Exception as exc:
+            self._error = exc
+            return
+        self._sent_chunks += 1
+        logger.info("Sent Slack chunk %d (streamed)", self._sent_chunks)
+
+
+# Markdown 변환기는 첫 사용 시 한 번만 생성하고 reset()으로 재사용 (send_email 전용, 동시 호출 없음)
+_MD: "markdown.Markdown | None" = None
+
+
+def get_markdown_converter() -> "markdown.Markdown":
+    global _MD
+    if _MD is None:
+        import markdown
+
+        _MD = markdown.Markdown(extensions=['tables', 'nl2br', 'fenced_code'])
+    return _MD.reset()
+
+
+# 이메일 HTML 템플릿 (정적). html_content만 실행마다 바뀌므로 모듈 로드 시 한 번만 생성
+EMAIL_HTML_TEMPLATE = """
+<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <style>
+        * {{ margin: 0; padding: 0; box-sizing: border-box; }}
+        body {{
+            font-family: -apple-system, BlinkMacSystemFont, 'Malgun Gothic', '맑은 고딕', 'Segoe UI', Arial, sans-serif;
+            font-size: 15px;
+            line-height: 1.7;
+            color: #2c3e50;
+            background-color: #f8f9fa;
+            padding: 20px;
+        }}
+        .container {{
+            max-width: 800px;
+            margin: 0 auto;
+            background-color: #ffffff;
+            padding: 30px;
+            border-radius: 8px;
+            box-shadow: 0 2px 8px rgba(0,0,0,0.1);
+        }}
+        h1 {{
+            font-size: 28px;
+            color: #ffffff;
+            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+            margin: -30px -30px 25px -30px;
+            padding: 25px 30px;
+            border-radius: 8px 8px 0 0;
+            text-align: center;
+            text-shadow: 2px 2px 4px rgba(0,0,0,0.3);
+            box-shadow: 0 4px 6px rgba(0,0,0,0.1);
+        }}
+        h2 {{
+            font-size: 22px;
+            color: #ffffff;
+            background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%);
+            margin: 35px -30px 20px -30px;
+            padding: 15px 30px;
+            border-left: 5px solid #e74c3c;
+            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+        }}
+        h3 {{
+            font-size: 19px;
+            color: #2c3e50;
+            margin-top: 30px;
+            margin-bottom: 15px;
+            padding: 12px 15px;
+            background-color: #ecf0f1;
+            border-left: 5px solid #3498db;
+            border-radius: 4px;
+        }}
+        p {{
+            font-size: 15px;
+            line-height: 1.7;
+            margin-bottom: 12px;
+        }}
+        table {{
+            border-collapse: separate;
+            border-spacing: 0;
+            width: 100%;
+            margin: 20px 0;
+            font-size: 14px;
+            background-color: #ffffff;
+            border: 2px solid #2c3e50;
+            border-radius: 8px;
+            overflow: hidden;
+            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+        }}
+        th, td {{
+            border: 1px solid #bdc3c7;
+            padding: 16px 14px;
+            text-align: left;
+            vertical-align: top;
+        }}
+        th {{
+            background: linear-gradient(135deg, #2c3e50 0%, #34495e 100%);
+            color: #ffffff;
+            font-weight: 700;
+            font-size: 15px;
+            text-transform: uppercase;
+            letter-spacing: 0.5px;
+            border: none;
+            border-bottom: 3px solid #e74c3c;
+        }}
+        td:first-child {{
+            background-color: #ecf0f1;
+            font-weight: 600;
+            color: #2c3e50;
+            width: 20%;
+            border-right: 2px solid #bdc3c7;
+        }}
+        tr:nth-child(even) td:not(:first-child) {{
+            background-color: #f8f9fa;
+        }}
+        tr:nth-child(odd) td:not(:first-child) {{
+            background-color: #ffffff;
+        }}
+        tr:hover td {{
+            background-color: #fff3cd !important;
+            transition: background-color 0.2s;
+        }}
+        tr:hover td:first-child {{
+            background-color: #ffeaa7 !important;
+        }}
+        hr {{
+            border: 0;
+            height: 3px;
+            background: linear-gradient(to right, #667eea, #764ba2, transparent);
+            margin: 30px 0;
+            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+        }}
+        code {{
+            background-color: #f4f4f4;
+            padding: 4px 10px;
+            border-radius: 4px;
+            font-family: 'Courier New', monospace;
+            font-size: 13px;
+            border: 1px solid #ddd;
+        }}
+        strong {{
+            color: #e74c3c;
+            font-weight: 700;
+            background-color: #ffe5e5;
+            padding: 2px 6px;
+            border-radius: 3px;
+        }}
+        p strong {{
+            background: none;
+            padding: 0;
+        }}
+        .news-meta {{
+            font-size: 14px;
+            color: #34495e;
+            background-color: #e8f4f8;
+            padding: 12px 15px;
+            margin: 10px 0 15px 0;
+            border-radius: 6px;
+            border-left: 4px solid #3498db;
+            box-shadow: 0 2px 4px rgba(0,0,0,0.05);
+        }}
+        blockquote {{
+            border-left: 4px solid #f39c12;
+            padding: 15px 20px;
+            margin: 15px 0;
+            background-color: #fef5e7;
+            border-radius: 4px;
+        }}
+        ul, ol {{
+            margin: 15px 0;
+            padding-left: 30px;
+            line-height: 1.8;
+        }}
+        li {{
+            margin-bottom: 8px;
+        }}
+        a {{
+            color: #3498db;
+            text-decoration: none;
+            font-weight: 600;
+            border-bottom: 1px solid transparent;
+            transition: all 0.2s;
+        }}
+        a:hover {{
+            color: #2980b9;
+            border-bottom-color: #2980b9;
+        }}
+        .news-meta a {{
+            color: #2c3e50;
+            font-weight: 700;
+            text-decoration: underline;
+        }}
+        .news-meta a:hover {{
+            color: #3498db;
+        }}
+        @media only screen and (max-width: 600px) {{
+            body {{ padding: 10px; }}
+            .container {{ padding: 20px; }}
+            h1 {{ font-size: 20px; }}
+            h2 {{ font-size: 18px; }}
+            table {{ font-size: 13px; }}
+            th, td {{ padding: 10px 8px; }}
+        }}
+    </style>
+</head>
+<body>
+    <div class="container">
+        {html_content}
+    </div>
+</body>
+</html>
+"""
+
+
 def send_email(text: str) -> DeliveryStatus:
     host = os.getenv("SMTP_HOST")
     port = os.getenv("SMTP_PORT")
@@ -353,236 +1112,63 @@ def send_email(text: str) -> DeliveryStatus:
     mail_from = os.getenv("MAIL_FROM")
     mail_to = os.getenv("MAIL_TO")
 
-    required = [host, port, user, password, mail_from, mail_to]
-    if not all(required):
-        logging.info("SMTP env vars incomplete, skipping email delivery")
+    if not all((host, port, user, password, mail_from, mail_to)):
+        logger.info("SMTP env vars incomplete, skipping email delivery")
         return DeliveryStatus(enabled=False, attempted=False, success=False, detail="smtp_not_fully_configured")
 
+    # 포트 값이 잘못되면 본문 변환 등 작업 전에 바로 종료
+    try:
+        port_number = int(port)
+    except ValueError:
+        logger.warning("SMTP_PORT is not a number (%r), skipping email delivery", port)
+        return DeliveryStatus(enabled=True, attempted=False, success=False, detail="smtp_port_invalid")
+
     recipients = [addr.strip() for addr in mail_to.split(",") if addr.strip()]
     if not recipients:
-        logging.info("MAIL_TO is empty after parsing, skipping email delivery")
+        logger.info("MAIL_TO is empty after parsing, skipping email delivery")
         return DeliveryStatus(enabled=False, attempted=False, success=False, detail="mail_to_empty")
 
-    now_kst = datetime.now(timezone(timedelta(hours=9))).strftime("%Y-%m-%d %H:%M KST")
+    # isoformat on the naive local time gives "YYYY-MM-DD HH:MM" without strftime
+    now_kst = datetime.now(timezone(timedelta(hours=9))).replace(tzinfo=None).isoformat(" ", "minutes") + " KST"
     subject = f"[Daily Trading Digest] {now_kst}"
 
     # Markdown을 HTML로 변환
-    html_content = markdown.markdown(
-        text,
-        extensions=['tables', 'nl2br', 'fenced_code']
-    )
+    html_content = get_markdown_converter().convert(text)
 
     # 기본 HTML 템플릿 적용
-    html_body = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="utf-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <style>
-            * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-            body {{
-                font-family: -apple-system, BlinkMacSystemFont, 'Malgun Gothic', '맑은 고딕', 'Segoe UI', Arial, sans-serif;
-                font-size: 15px;
-                line-height: 1.7;
-                color: #2c3e50;
-                background-color: #f8f9fa;
-                padding: 20px;
-            }}
-            .container {{
-                max-width: 800px;
-                margin: 0 auto;
-                background-color: #ffffff;
-                padding: 30px;
-                border-radius: 8px;
-                box-shadow: 0 2px 8px rgba(0,0,0,0.1);
-            }}
-            h1 {{
-                font-size: 28px;
-                color: #ffffff;
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                margin: -30px -30px 25px -30px;
-                padding: 25px 30px;
-                border-radius: 8px 8px 0 0;
-                text-align: center;
-                text-shadow: 2px 2px 4px rgba(0,0,0,0.3);
-                box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-            }}
-            h2 {{
-                font-size: 22px;
-                color: #ffffff;
-                background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%);
-                margin: 35px -30px 20px -30px;
-                padding: 15px 30px;
-                border-left: 5px solid #e74c3c;
-                box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-            }}
-            h3 {{
-                font-size: 19px;
-                color: #2c3e50;
-                margin-top: 30px;
-                margin-bottom: 15px;
-                padding: 12px 15px;
-                background-color: #ecf0f1;
-                border-left: 5px solid #3498db;
-                border-radius: 4px;
-            }}
-            p {{
-                font-size: 15px;
-                line-height: 1.7;
-                margin-bottom: 12px;
-            }}
-            table {{
-                border-collapse: separate;
-                border-spacing: 0;
-                width: 100%;
-                margin: 20px 0;
-                font-size: 14px;
-                background-color: #ffffff;
-                border: 2px solid #2c3e50;
-                border-radius: 8px;
-                overflow: hidden;
-                box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-            }}
-            th, td {{
-                border: 1px solid #bdc3c7;
-                padding: 16px 14px;
-                text-align: left;
-                vertical-align: top;
-            }}
-            th {{
-                background: linear-gradient(135deg, #2c3e50 0%, #34495e 100%);
-                color: #ffffff;
-                font-weight: 700;
-                font-size: 15px;
-                text-transform: uppercase;
-                letter-spacing: 0.5px;
-                border: none;
-                border-bottom: 3px solid #e74c3c;
-            }}
-            td:first-child {{
-                background-color: #ecf0f1;
-                font-weight: 600;
-                color: #2c3e50;
-                width: 20%;
-                border-right: 2px solid #bdc3c7;
-            }}
-            tr:nth-child(even) td:not(:first-child) {{
-                background-color: #f8f9fa;
-            }}
-            tr:nth-child(odd) td:not(:first-child) {{
-                background-color: #ffffff;
-            }}
-            tr:hover td {{
-                background-color: #fff3cd !important;
-                transition: background-color 0.2s;
-            }}
-            tr:hover td:first-child {{
-                background-color: #ffeaa7 !important;
-            }}
-            hr {{
-                border: 0;
-                height: 3px;
-                background: linear-gradient(to right, #667eea, #764ba2, transparent);
-                margin: 30px 0;
-                box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-            }}
-            code {{
-                background-color: #f4f4f4;
-                padding: 4px 10px;
-                border-radius: 4px;
-                font-family: 'Courier New', monospace;
-                font-size: 13px;
-                border: 1px solid #ddd;
-            }}
-            strong {{
-                color: #e74c3c;
-                font-weight: 700;
-                background-color: #ffe5e5;
-                padding: 2px 6px;
-                border-radius: 3px;
-            }}
-            p strong {{
-                background: none;
-                padding: 0;
-            }}
-            .news-meta {{
-                font-size: 14px;
-                color: #34495e;
-                background-color: #e8f4f8;
-                padding: 12px 15px;
-                margin: 10px 0 15px 0;
-                border-radius: 6px;
-                border-left: 4px solid #3498db;
-                box-shadow: 0 2px 4px rgba(0,0,0,0.05);
-            }}
-            blockquote {{
-                border-left: 4px solid #f39c12;
-                padding: 15px 20px;
-                margin: 15px 0;
-                background-color: #fef5e7;
-                border-radius: 4px;
-            }}
-            ul, ol {{
-                margin: 15px 0;
-                padding-left: 30px;
-                line-height: 1.8;
-            }}
-            li {{
-                margin-bottom: 8px;
-            }}
-            a {{
-                color: #3498db;
-                text-decoration: none;
-                font-weight: 600;
-                border-bottom: 1px solid transparent;
-                transition: all 0.2s;
-            }}
-            a:hover {{
-                color: #2980b9;
-                border-bottom-color: #2980b9;
-            }}
-            .news-meta a {{
-                color: #2c3e50;
-                font-weight: 700;
-                text-decoration: underline;
-            }}
-            .news-meta a:hover {{
-                color: #3498db;
-            }}
-            @media only screen and (max-width: 600px) {{
-                body {{ padding: 10px; }}
-                .container {{ padding: 20px; }}
-                h1 {{ font-size: 20px; }}
-                h2 {{ font-size: 18px; }}
-                table {{ font-size: 13px; }}
-                th, td {{ padding: 10px 8px; }}
-            }}
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            {html_content}
-        </div>
-    </body>
-    </html>
-    """
+    html_body = EMAIL_HTML_TEMPLATE.format(html_content=html_content)
 
     # CSS를 인라인 스타일로 변환 (이메일 클라이언트 호환성)
-    html_body_inlined = transform(html_body)
+    # 셀렉터가 생성된 본문 요소를 대상으로 하므로 템플릿만 미리 인라인할 수는 없음.
+    # 대신 cssutils 검증을 끄고 파싱 결과를 캐시해 변환 비용을 줄인다.
+    # EMAIL_INLINE_CSS=false면 premailer를 건너뛰고 <style> 블록 그대로 전송 (Gmail 등 최신 클라이언트용)
+    if EMAIL_INLINE_CSS:
+        from premailer import Premailer
 
-    msg = MIMEText(html_body_inlined, _subtype="html", _charset="utf-8")
+        html_body = Premailer(html_body, disable_validation=True, cache_css_parsing=True).transform()
+
+    msg = MIMEText(html_body, _subtype="html", _charset="utf-8")
     msg["Subject"] = subject
     msg["From"] = mail_from
     msg["To"] = ", ".join(recipients)
     msg["Date"] = formatdate(localtime=True)
 
-    with smtplib.SMTP(host, int(port), timeout=30) as server:
-        server.starttls()
+    # 465는 암묵적 TLS(SMTP_SSL)로 STARTTLS 왕복을 생략, 그 외 포트는 기존 STARTTLS 사용
+    ctx = ssl.create_default_context()
+    ctx.options |= ssl.OP_NO_COMPRESSION
+    if port_number == 465:
+        server = smtplib.SMTP_SSL(host, port_number, context=ctx, timeout=30)
+    else:
+        server = smtplib.SMTP(host, port_number, timeout=30)
+
+    # starttls는 with 블록 안에서 호출해 핸드셰이크(인증서 검증) 실패 시에도 소켓이 닫히도록 함
+    with server:
+        if port_number != 465:
+            server.starttls(context=ctx)
         server.login(user, password)
-        server.sendmail(mail_from, recipients, msg.as_string())
+        server.send_message(msg, from_addr=mail_from, to_addrs=recipients)
 
-    logging.info("Email sent to %d recipients", len(recipients))
+    logger.info("Email sent to %d recipients", len(recipients))
     return DeliveryStatus(
         enabled=True,
         attempted=True,
@@ -596,14 +1182,15 @@ def parse_line_with_links(line: str) -> List[dict]:
     Parse a line and convert HTML links to Notion rich_text format.
     Returns list of rich_text objects with proper link formatting.
     """
-    import re
+    # Most lines are plain markdown; skip the regex when no anchor can match
+    if "<a" not in line:
+        return [{"type": "text", "text": {"content": line}}]
 
     rich_text = []
-    # Pattern to match <a href="url">text</a>
-    link_pattern = r'<a\s+href="([^"]*)">([^<]*)</a>'
 
     last_end = 0
-    for match in re.finditer(link_pattern, line):
+    # Match <a href="url">text</a>
+    for match in _LINK_RE.finditer(line):
         # Add text before the link
         if match.start() > last_end:
             plain_text = line[last_end:match.start()]
@@ -641,19 +1228,26 @@ def parse_line_with_links(line: str) -> List[dict]:
     return rich_text
 
 
+def make_text_block(block_type: str, content: str) -> dict:
+    # Notion has a 2000 character limit per rich_text object
+    return {
+        "object": "block",
+        "type": block_type,
+        block_type: {
+            "rich_text": parse_line_with_links(content[:2000])
+        }
+    }
+
+
 def markdown_to_notion_blocks(text: str) -> List[dict]:
     """
     Convert markdown text to Notion blocks.
     Handles headings, paragraphs, horizontal rules, lists, and HTML links.
     Converts <a> tags to Notion's link format, removes other HTML tags.
     """
-    import re
-
-    # Remove <div> tags but keep content
-    text = re.sub(r'<div[^>]*>', '', text)
-    text = re.sub(r'</div>', '', text)
-    # Remove other HTML tags except <a> (we'll handle those specially)
-    text = re.sub(r'<(?!a\s)(?!/a>)[^>]+>', '', text)
+    # Remove HTML tags (including <div> wrappers) but keep content, except <a>
+    # which we'll handle specially - one pass over the text
+    text = _HTML_TAG_RE.sub('', text)
 
     blocks = []
     lines = text.split('\n')
@@ -661,51 +1255,28 @@ def markdown_to_notion_blocks(text: str) -> List[dict]:
 
     while i < len(lines):
         line = lines[i]
-
-        # Heading 1
-        if line.startswith('# '):
-            content = line[2:].strip()[:2000]
-            blocks.append({
-                "object": "block",
-                "type": "heading_1",
-                "heading_1": {
-                    "rich_text": parse_line_with_links(content)
-                }
-            })
-        # Heading 2
-        elif line.startswith('## '):
-            content = line[3:].strip()[:2000]
-            blocks.append({
-                "object": "block",
-                "type": "heading_2",
-                "heading_2": {
-                    "rich_text": parse_line_with_links(content)
-                }
-            })
-        # Heading 3
-        elif line.startswith('### '):
-            content = line[4:].strip()[:2000]
-            blocks.append({
-                "object": "block",
-                "type": "heading_3",
-                "heading_3": {
-                    "rich_text": parse_line_with_links(content)
-                }
-            })
+        stripped = line.strip()
+
+        # Headings: "# ", "## ", "### " (the token before the first space is the marker)
+        # Headings need the space after the marker; a bare "#" line stays a paragraph
+        marker, sep, rest = line.partition(' ')
+        heading_type = _HEADING_TYPES.get(marker) if sep else None
+        if heading_type:
+            blocks.append(make_text_block(heading_type, rest.strip()))
         # Horizontal rule
-        elif line.strip() == '---':
+        elif stripped == '---':
             blocks.append({
                 "object": "block",
                 "type": "divider",
                 "divider": {}
             })
         # Markdown table — collect all rows and emit a Notion table block
-        elif line.strip().startswith('|'):
+        elif stripped[:1] == '|':
             table_rows = []
             while i < len(lines) and lines[i].strip().startswith('|'):
                 row_line = lines[i].strip()
                 # Skip separator lines (|---|---|)
-                if re.match(r'^\|[\s\-|:]+\|$', row_line):
+                if _TABLE_SEPARATOR_RE.match(row_line):
                     i += 1
                     continue
                 cells = [c.strip() for c in row_line.strip('|').split('|')]
@@ -736,63 +1307,36 @@ def markdown_to_notion_blocks(text: str) -> List[dict]:
                 })
             continue  # i already incremented in the while loop
         # Bulleted list
-        elif line.strip().startswith('- ') or line.strip().startswith('* '):
-            content = line.strip()[2:].strip()[:2000]
-            blocks.append({
-                "object": "block",
-                "type": "bulleted_list_item",
-                "bulleted_list_item": {
-                    "rich_text": parse_line_with_links(content)
-                }
-            })
-        # Numbered list
-        elif len(line) > 2 and line[0].isdigit() and line[1:3] in ['. ', ') ']:
-            content = line[3:].strip()[:2000]
-            blocks.append({
-                "object": "block",
-                "type": "numbered_list_item",
-                "numbered_list_item": {
-                    "rich_text": parse_line_with_links(content)
-                }
-            })
+        elif stripped[:2] in ('- ', '* '):
+            blocks.append(make_text_block("bulleted_list_item", stripped[2:].strip()))
+        # Numbered list ("1. ", "12) ")
+        elif (num_match := _NUMBERED_LIST_RE.match(line)):
+            blocks.append(make_text_block("numbered_list_item", line[num_match.end():].strip()))
         # Non-empty paragraph
-        elif line.strip():
-            # Notion has a 2000 character limit per rich_text object
-            content = line.strip()[:2000]
-            blocks.append({
-                "object": "block",
-                "type": "paragraph",
-                "paragraph": {
-                    "rich_text": parse_line_with_links(content)
-                }
-            })
+        elif stripped:
+            blocks.append(make_text_block("paragraph", stripped))
 
         i += 1
 
     return blocks
 
 
-def extract_table_value(text: str, section_marker: str, row_key: str) -> str:
-    """Extract value from markdown table in a specific section."""
-    try:
-        # Find the section
-        section_start = text.find(section_marker)
-        if section_start == -1:
-            return ""
-
-        # Find the next section or end
-        next_section = text.find("\n## ", section_start + len(section_marker))
-        section_text = text[section_start:next_section] if next_section != -1 else text[section_start:]
-
-        # Find the row with the key
-        for line in section_text.split('\n'):
-            if line.strip().startswith(f"| {row_key}"):
-                parts = [p.strip() for p in line.split('|')]
-                if len(parts) >= 3:
-                    return parts[2]  # Value is in the 3rd column
-        return ""
-    except Exception:
+def extract_section(text: str, section_marker: str) -> str:
+    """Return the markdown section starting at section_marker, up to the next '## ' heading."""
+    section_start = text.find(section_marker)
+    if section_start == -1:
         return ""
+    next_section = text.find("\n## ", section_start + len(section_marker))
+    return text[section_start:next_section] if next_section != -1 else text[section_start:]
+
+
+def extract_table_value(section_text: str, row_key: str) -> str:
+    """Extract value from markdown table row in an already isolated section."""
+    pattern = _REGIME_ROW_RES.get(row_key)
+    if pattern is None:
+        pattern = re.compile(rf'^[ \t]*\| {re.escape(row_key)}[^|\n]*\|([^|\n]*)', re.MULTILINE)
+    match = pattern.search(section_text)
+    return match.group(1).strip() if match else ""
 
 
 def fetch_realtime_market_data() -> dict:
@@ -813,7 +1357,6 @@ def fetch_realtime_market_data() -> dict:
     try:
         import yfinance as yf
 
-        # Use download function which is more reliable
         symbols = {
             "^VIX": "vix",
             "^GSPC": "sp500",
@@ -822,36 +1365,51 @@ def fetch_realtime_market_data() -> dict:
             "^TNX": "bond_10y"
         }
 
+        # One batched request for all symbols instead of one round-trip per symbol
+        frame = yf.download(
+            list(symbols),
+            period="5d",
+            group_by="ticker",
+            threads=True,
+            progress=False,
+            auto_adjust=False,
+        )
+
         for symbol, key in symbols.items():
             try:
-                ticker_data = yf.download(symbol, period="5d", progress=False)
-                if not ticker_data.empty:
-                    value = ticker_data['Close'].iloc[-1]
-
-                    if key == "vix":
-                        data[key] = round(value, 2)
-                    elif key == "sp500":
-                        data[key] = round(value, 1)
-                    elif key == "kospi":
-                        data[key] = round(value, 0)
-                    elif key == "usdkrw":
-                        data[key] = round(value, 0)
-                    elif key == "bond_10y":
-                        # TNX returns percentage (e.g., 4.25), convert to decimal
-                        data[key] = round(value / 100, 4)
-
-            except Exception as e:
-                logging.warning(f"Failed to fetch {symbol}: {e}")
+                closes = frame[symbol]["Close"].dropna()
+            except KeyError:
+                logger.warning("Failed to fetch %s: no data in batch download", symbol)
+                continue
+            if closes.empty:
+                logger.warning("Failed to fetch %s: no recent close", symbol)
+                continue
+
+            value = float(closes.iloc[-1])
+            if key == "vix":
+                data[key] = round(value, 2)
+            elif key == "sp500":
+                data[key] = round(value, 1)
+            elif key == "kospi":
+                data[key] = round(value, 0)
+            elif key == "usdkrw":
+                data[key] = round(value, 0)
+            elif key == "bond_10y":
+                # TNX returns percentage (e.g., 4.25), convert to decimal
+                data[key] = round(value / 100, 4)
 
         if data["vix"] > 0 or data["sp500"] > 0:
-            logging.info(f"Fetched market data: VIX={data['vix']}, S&P500={data['sp500']}, KOSPI={data['kospi']}, USD/KRW={data['usdkrw']}, 10Y={data['bond_10y']}")
+            logger.info(
+                "Fetched market data: VIX=%s, S&P500=%s, KOSPI=%s, USD/KRW=%s, 10Y=%s",
+                data["vix"], data["sp500"], data["kospi"], data["usdkrw"], data["bond_10y"],
+            )
         else:
-            logging.warning("No market data fetched - all values are 0.0")
+            logger.warning("No market data fetched - all values are 0.0")
 
     except ImportError:
-        logging.warning("yfinance not installed, skipping real-time market data fetch")
+        logger.warning("yfinance not installed, skipping real-time market data fetch")
     except Exception as e:
-        logging.error(f"Error fetching market data: {e}")
+        logger.error("Error fetching market data: %s", e)
 
     return data
 
@@ -859,137 +1417,87 @@ def fetch_realtime_market_data() -> dict:
 def extract_digest_properties(text: str) -> dict:
     """Extract structured properties from digest markdown text."""
     now_kst = datetime.now(timezone(timedelta(hours=9)))
-    date_str = now_kst.strftime("%Y-%m-%d")
+    date_str = now_kst.date().isoformat()
 
     # Extract 한줄 요약 from "시장 레짐" section
-    summary = ""
-    summary_match = text.find("💡 한줄 요약:")
-    if summary_match != -1:
-        summary_end = text.find("\n", summary_match)
-        if summary_end != -1:
-            prefix = "💡 한줄 요약:"
-            summary = text[summary_match + len(prefix):summary_end].strip()
+    summary_match = _SUMMARY_LINE_RE.search(text)
+    summary = summary_match.group(1).strip() if summary_match else ""
 
     # Extract values from "시장 레짐 & 온도" table
-    market_mode_raw = extract_table_value(text, "## 0. 시장 레짐", "시장 모드")
-    global_sentiment_raw = extract_table_value(text, "## 0. 시장 레짐", "글로벌 심리")
-    vix_str = extract_table_value(text, "## 0. 시장 레짐", "변동성 환경")
+    regime_section = extract_section(text, _REGIME_SECTION)
+    market_mode_raw = extract_table_value(regime_section, "시장 모드")
+    global_sentiment_raw = extract_table_value(regime_section, "글로벌 심리")
+    vix_str = extract_table_value(regime_section, "변동성 환경")
 
     # Clean up select field values - extract only the key word, not explanations
     # Split by common separators and take the first word
-    import re
     market_mode = market_mode_raw.split('(')[0].split('—')[0].split('/')[0].strip() if market_mode_raw else ""
     global_sentiment = global_sentiment_raw.split('(')[0].split('—')[0].split('/')[0].strip() if global_sentiment_raw else ""
 
     # Extract VIX number
     vix = 0.0
     if vix_str and "VIX" in vix_str:
-        import re
-        vix_match = re.search(r'(\d+\.?\d*)', vix_str)
+        vix_match = _NUMBER_RE.search(vix_str)
         if vix_match:
             vix = float(vix_match.group(1))
 
-    # Extract market indices from text
-    sp500 = 0.0
-    kospi = 0.0
-    usdkrw = 0.0
-    bond_10y = 0.0
-
-    # Look for S&P 500 variations - only extract if value is realistic (> 1000)
-    sp_patterns = [r'S&P\s*500[:\s]+(\d{4,5}\.?\d*)', r'S&P[:\s]+(\d{4,5}\.?\d*)']
-    for pattern in sp_patterns:
-        sp_match = re.search(pattern, text, re.IGNORECASE)
-        if sp_match:
-            value = float(sp_match.group(1))
-            if value > 1000:  # Sanity check
-                sp500 = value
-                break
-
-    # Look for KOSPI - only extract if value is realistic (> 1000)
-    kospi_match = re.search(r'KOSPI[:\s]+(\d{4,5}\.?\d*)', text, re.IGNORECASE)
-    if kospi_match:
-        value = float(kospi_match.group(1))
-        if value > 1000:  # Sanity check
-            kospi = value
-
-    # Look for USD/KRW - only extract if value is realistic (1000-2000)
-    usdkrw_patterns = [r'USD/KRW[:\s]+(\d{4}\.?\d*)', r'원달러[:\s]+(\d{4}\.?\d*)']
-    for pattern in usdkrw_patterns:
-        usd_match = re.search(pattern, text, re.IGNORECASE)
-        if usd_match:
-            value = float(usd_match.group(1))
-            if 1000 <= value <= 2000:  # Sanity check for won/dollar
-                usdkrw = value
-                break
-
-    # Look for 10Y bond yield - only extract if value is realistic (0.5-10%)
-    bond_patterns = [r'10Y[:\s]+(\d+\.?\d*)%', r'10년물[:\s]+(\d+\.?\d*)%']
-    for pattern in bond_patterns:
-        bond_match = re.search(pattern, text, re.IGNORECASE)
-        if bond_match:
-            value = float(bond_match.group(1))
-            # Value should be between 0.5 and 10 for realistic bond yields
-            if 0.5 <= value <= 10:
-                bond_10y = value / 100  # Convert to decimal
+    # Extract market indices from text in a single scan, keeping the first realistic value per field
+    market_values = dict.fromkeys(_MARKET_VALUE_CHECKS, 0.0)
+    for match in _MARKET_VALUE_RE.finditer(text):
+        field = match.lastgroup
+        if market_values[field]:
+            continue
+        value = float(match.group(field))
+        if _MARKET_VALUE_CHECKS[field](value):
+            market_values[field] = value
+    # The regime table row is the primary VIX source; fall back to a mention anywhere in the text
+    if not vix:
+        for vix_match in _VIX_VALUE_RE.finditer(text):
+            value = float(vix_match.group(1))
+            if 5 <= value <= 100:  # Sanity check
+                vix = value
                 break
+    sp500 = market_values["sp500"]
+    kospi = market_values["kospi"]
+    usdkrw = market_values["usdkrw"]
+    bond_10y = market_values["bond_10y"] / 100  # Convert to decimal
 
     # Extract 시장 분위기 from "오늘의 단타 전략"
-    market_atmosphere = ""
-    atm_match = text.find("**시장 분위기**:")
-    if atm_match != -1:
-        atm_end = text.find("\n", atm_match)
-        if atm_end != -1:
-            atm_line = text[atm_match:atm_end]
-            # Extract first word after "분위기**: "
-            parts = atm_line.split("**: ")
-            if len(parts) > 1:
-                market_atmosphere = parts[1].split(" ")[0].strip()
+    # Extract first word after "분위기**: "
+    atm_match = _ATMOSPHERE_LINE_RE.search(text)
+    market_atmosphere = atm_match.group(1).strip() if atm_match else ""
 
     # Extract 분석 확신도 from "시장 레짐 & 온도" table (overall digest confidence)
     confidence = ""
-    confidence_str = extract_table_value(text, "## 0. 시장 레짐", "분석 확신도")
+    confidence_str = extract_table_value(regime_section, "분석 확신도")
     if confidence_str:
         # Normalize confidence to match Notion select options
         # Count filled stars (★) to determine level
         filled_stars = confidence_str.count('★')
-        if filled_stars == 5:
-            confidence = "★★★★★ (90%+)"
-        elif filled_stars == 4:
-            confidence = "★★★★☆ (70-89%)"
-        elif filled_stars == 3:
-            confidence = "★★★☆☆ (50-69%)"
-        elif filled_stars == 2:
-            confidence = "★★☆☆☆ (30-49%)"
-        elif filled_stars == 1:
-            confidence = "★☆☆☆☆ (<30%)"
+        if 1 <= filled_stars <= 5:
+            confidence = _CONFIDENCE_TABLE[filled_stars]
         else:
             # If already in correct format, use as is
             confidence = confidence_str if confidence_str else "정보 없음"
 
     # Extract 최우선 관심 종목
     priority_stocks = ""
-    priority_match = text.find("**🎯 최우선 관심**:")
-    if priority_match != -1:
-        priority_end = text.find("\n", priority_match)
-        if priority_end != -1:
-            priority_line = text[priority_match + 16:priority_end]
-            # Extract stock names/codes
-            import re
-            # Find patterns like "종목명 (코드)" or just "종목명"
-            stocks = re.findall(r'[\w가-힣]+\s*\([A-Z0-9]+\)', priority_line)
-            if stocks:
-                priority_stocks = ", ".join(stocks[:3])  # Top 3
+    priority_match = _PRIORITY_LINE_RE.search(text)
+    if priority_match:
+        # Extract stock names/codes
+        # Find patterns like "종목명 (코드)" or just "종목명"
+        stocks = _PRIORITY_STOCK_RE.findall(priority_match.group(1))
+        if stocks:
+            priority_stocks = ", ".join(stocks[:3])  # Top 3
 
     # Extract keywords from first few sections
-    keywords = []
-    # Look for common themes in headings
-    for keyword in ["반도체", "금리", "AI", "지정학", "실적", "금", "원자재", "로테이션", "정치", "중국"]:
-        if keyword in text[:2000]:  # Check in first part of text
-            keywords.append(keyword)
+    # Look for common themes in headings (check in first part of text, sliced once)
+    head = text[:THEME_KEYWORD_SCAN_CHARS]
+    keywords = [keyword for keyword in THEME_KEYWORDS if keyword in head]
 
     # Fetch real-time market data as fallback if text extraction failed
     if vix == 0.0 or sp500 == 0.0 or kospi == 0.0 or usdkrw == 0.0 or bond_10y == 0.0:
-        logging.info("Text extraction incomplete, fetching real-time market data...")
+        logger.info("Text extraction incomplete, fetching real-time market data...")
         realtime_data = fetch_realtime_market_data()
 
         # Use real-time data as fallback
@@ -1038,7 +1546,7 @@ def send_to_notion(text: str) -> DeliveryStatus:
     data_source_id = os.getenv("NOTION_DATA_SOURCE_ID")
 
     if not token or not data_source_id:
-        logging.info("Notion env vars not set, skipping Notion delivery")
+        logger.info("Notion env vars not set, skipping Notion delivery")
         return DeliveryStatus(
             enabled=False,
             attempted=False,
@@ -1046,11 +1554,15 @@ def send_to_notion(text: str) -> DeliveryStatus:
             detail="notion_not_configured"
         )
 
-    try:
-        notion = NotionClient(auth=token)
+    headers = {
+        "Authorization": f"Bearer {token}",
+        "Content-Type": "application/json",
+        "Notion-Version": NOTION_API_VERSION,
+    }
 
+    try:
         # Extract structured properties from markdown
-        logging.info("Extracting digest properties...")
+        logger.info("Extracting digest properties...")
         props_raw = extract_digest_properties(text)
 
         # Parse keywords from JSON string
@@ -1107,12 +1619,12 @@ def send_to_notion(text: str) -> DeliveryStatus:
         }
 
         # Convert markdown to Notion blocks
-        logging.info("Converting markdown to Notion blocks...")
+        logger.info("Converting markdown to Notion blocks...")
         children = markdown_to_notion_blocks(text)
 
         # Create page using standard Notion structure
         # (treating data_source_id as database_id for now)
-        logging.info("Creating Notion page: %s", props_raw["제목"])
+        logger.info("Creating Notion page: %s", props_raw["제목"])
 
         payload = {
             "parent": {
@@ -1120,62 +1632,51 @@ def send_to_notion(text: str) -> DeliveryStatus:
                 "data_source_id": data_source_id
             },
             "properties": properties,
-            "children": children[:100]  # Notion has limit on children blocks
+            "children": children[:NOTION_MAX_BLOCKS]  # Notion has limit on children blocks
         }
 
-        # Use direct API call since notion-client might not support this structure yet
-        import requests
-        response = requests.post(
-            "https://api.notion.com/v1/pages",
-            headers={
-                "Authorization": f"Bearer {token}",
-                "Content-Type": "application/json",
-                "Notion-Version": "2022-06-28"
-            },
-            json=payload,
-            timeout=30
-        )
+        # Direct REST call over the shared keep-alive session
+        response = _HTTP.post(f"{NOTION_API_URL}/pages", headers=headers, json=payload, timeout=30)
 
         if not response.ok:
-            logging.error("Notion API error response: %s", response.text)
+            logger.error("Notion API error response: %s", response.text)
 
         response.raise_for_status()
-        result = response.json()
+        result = loads_json(response.content)
 
         page_id = result.get("id", "unknown")
-        logging.info("Notion page created with ID: %s", page_id)
-
-        # Append remaining blocks in chunks of 100
-        remaining = children[100:]
-        chunk_num = 1
-        while remaining:
-            chunk = remaining[:100]
-            remaining = remaining[100:]
-            append_response = requests.patch(
-                f"https://api.notion.com/v1/blocks/{page_id}/children",
-                headers={
-                    "Authorization": f"Bearer {token}",
-                    "Content-Type": "application/json",
-                    "Notion-Version": "2022-06-28"
-                },
+        logger.info("Notion page created with ID: %s", page_id)
+
+        # Append remaining blocks in batches. Each append lands at the end of the page,
+        # so batches must go out one at a time to keep the digest in order.
+        failed_chunks = []
+        for chunk_num, offset in enumerate(range(NOTION_MAX_BLOCKS, len(children), NOTION_MAX_BLOCKS), 1):
+            chunk = children[offset:offset + NOTION_MAX_BLOCKS]
+            append_response = _HTTP.patch(
+                f"{NOTION_API_URL}/blocks/{page_id}/children",
+                headers=headers,
                 json={"children": chunk},
-                timeout=30
+                timeout=30,
             )
             if not append_response.ok:
-                logging.warning("Failed to append block chunk %d: %s", chunk_num, append_response.text)
+                logger.warning("Failed to append block chunk %d: %s", chunk_num, append_response.text)
+                failed_chunks.append(chunk_num)
             else:
-                logging.info("Appended block chunk %d (%d blocks)", chunk_num, len(chunk))
-            chunk_num += 1
+                logger.info("Appended block chunk %d (%d blocks)", chunk_num, len(chunk))
 
+        detail = f"page_id={page_id[:8]}..., title={props_raw['제목'][:30]}"
+        if failed_chunks:
+            # The page exists but is missing content; record it so the run report shows the gap
+            detail += f", failed_block_chunks={failed_chunks}"
         return DeliveryStatus(
             enabled=True,
             attempted=True,
             success=True,
-            detail=f"page_id={page_id[:8]}..., title={props_raw['제목'][:30]}"
+            detail=detail,
         )
 
     except Exception as exc:
-        logging.error("Failed to send to Notion: %s", exc, exc_info=True)
+        logger.error("Failed to send to Notion: %s", exc, exc_info=True)
         return DeliveryStatus(
             enabled=True,
             attempted=True,
@@ -1186,12 +1687,10 @@ def send_to_notion(text: str) -> DeliveryStatus:
 
 def write_run_report(report: dict) -> None:
     REPORT_DIR.mkdir(parents=True, exist_ok=True)
-    run_id = os.getenv("GITHUB_RUN_ID", datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S"))
-    json_path = REPORT_DIR / f"delivery-report-{run_id}.json"
+    run_id = os.getenv("GITHUB_RUN_ID", to_gdelt_dt(iso_utc_now()))
+    json_path = REPORT_DIR / f"delivery-report-{run_id}.json.gz"
     md_path = REPORT_DIR / f"delivery-report-{run_id}.md"
 
-    json_path.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
-
     summary_lines = [
         "# Daily Trading Digest Delivery Report",
         "",
@@ -1208,8 +1707,31 @@ def write_run_report(report: dict) -> None:
     if report.get("error"):
         summary_lines.extend(["", "## Error", f"`{report['error']}`"])
 
-    md_path.write_text("\n".join(summary_lines), encoding="utf-8")
-    logging.info("Wrote run reports: %s, %s", json_path, md_path)
+    # Serialize both reports up front, then write raw bytes (no text-mode encoding layer).
+    # Level-1 gzip keeps the JSON small for artifact retention at near-copy speed.
+    json_blob = gzip.compress(dumps_json(report), compresslevel=1)
+    md_blob = "\n".join(summary_lines).encode("utf-8")
+    json_path.write_bytes(json_blob)
+    md_path.write_bytes(md_blob)
+    logger.info("Wrote run reports: %s, %s", json_path, md_path)
+    prune_run_reports()
+
+
+def prune_run_reports() -> None:
+    """Delete delivery reports older than REPORT_RETENTION_DAYS."""
+    if REPORT_RETENTION_DAYS <= 0:
+        return
+    cutoff = time.time() - REPORT_RETENTION_DAYS * 86400
+    removed = 0
+    for path in REPORT_DIR.glob("delivery-report-*"):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+                removed += 1
+        except FileNotFoundError:
+            continue
+    if removed:
+        logger.info("Pruned %d delivery reports older than %d days", removed, REPORT_RETENTION_DAYS)
 
 
 def main() -> None:
@@ -1239,36 +1761,53 @@ def main() -> None:
     }
 
     try:
-        news_items = fetch_recent_news(cfg)
+        prune_response_cache()
+        # Import google-genai and build the client while the GDELT request is in flight.
+        # A warm-up failure is ignored here; generate_digest retries and surfaces it.
+        with ThreadPoolExecutor(max_workers=1) as warmup:
+            if os.getenv("GOOGLE_API_KEY"):
+                warmup.submit(get_genai_client)
+            news_items = fetch_recent_news(cfg)
         report["news_count"] = len(news_items)
         if not news_items:
             raise RuntimeError("No recent articles from GDELT. Try broadening keywords or increasing max records.")
 
-        digest = generate_digest(news_items, cfg.prompt_rice)
-
-        try:
-            slack_status = send_to_slack(digest, cfg.slack_chunk_size)
-            report["delivery"]["slack"] = slack_status.__dict__
-        except Exception as exc:
-            report["delivery"]["slack"] = DeliveryStatus(
-                enabled=True, attempted=True, success=False, detail=f"error={exc}"
-            ).__dict__
-
+        # Stream the digest to Slack as it is generated so the first message does not wait for the full output
+        webhook = os.getenv("SLACK_WEBHOOK_URL")
+        slack_streamer = SlackStreamer(webhook, cfg.slack_chunk_size) if webhook and cfg.slack_stream else None
         try:
-            email_status = send_email(digest)
-            report["delivery"]["email"] = email_status.__dict__
-        except Exception as exc:
-            report["delivery"]["email"] = DeliveryStatus(
-                enabled=True, attempted=True, success=False, detail=f"error={exc}"
-            ).__dict__
+            digest = generate_digest(
+                news_items, cfg.prompt_rice, on_text=slack_streamer.feed if slack_streamer else None
+            )
+        except Exception:
+            if slack_streamer is not None:
+                try:
+                    report["delivery"]["slack"] = asdict(slack_streamer.close(flush=False))
+                except Exception as exc:
+                    report["delivery"]["slack"] = asdict(
+                        DeliveryStatus(enabled=True, attempted=True, success=False, detail=f"error={exc}")
+                    )
+            raise
+
+        # Slack, email and Notion are independent blocking network calls, so overlap them
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            futures = {
+                "slack": (
+                    pool.submit(slack_streamer.close)
+                    if slack_streamer is not None
+                    else pool.submit(send_to_slack, digest, cfg.slack_chunk_size, cfg.slack_parallel)
+                ),
+                "email": pool.submit(send_email, digest),
+                "notion": pool.submit(send_to_notion, digest),
+            }
 
-        try:
-            notion_status = send_to_notion(digest)
-            report["delivery"]["notion"] = notion_status.__dict__
-        except Exception as exc:
-            report["delivery"]["notion"] = DeliveryStatus(
-                enabled=True, attempted=True, success=False, detail=f"error={exc}"
-            ).__dict__
+        for channel, future in futures.items():
+            try:
+                report["delivery"][channel] = asdict(future.result())
+            except Exception as exc:
+                report["delivery"][channel] = asdict(
+                    DeliveryStatus(enabled=True, attempted=True, success=False, detail=f"error={exc}")
+                )
 
         # Check if all delivery methods failed
         all_failed = all(